@@ -9,10 +9,38 @@ class Settings(BaseSettings):
     qdrant_url: str | None = None
     qdrant_api_key: str | None = None
     qdrant_collection: str = "creta_part8"
+    # Server mode only: use gRPC for data-plane calls
+    qdrant_prefer_grpc: bool = True
+    qdrant_grpc_port: int = 6334
+    # Server mode only: connections kept open per client, request timeout (s)
+    qdrant_pool_size: int = 100
+    qdrant_timeout: int = 30
 
     # Embeddings
     embed_model: str = "BAAI/bge-small-en-v1.5"
     top_k: int = 4
+    # Directory with an INT8 export from `python -m app.rag.quantize` (None = stock model)
+    embed_model_path: str | None = None
+    # ONNX Runtime intra-op threads for the embedder (None = runtime default)
+    embed_threads: int | None = None
+    # Concurrent /query embeddings arriving within this window share one batch
+    embed_batch_window_ms: float = 8.0
+    embed_max_batch: int = 32
+    # Memoized single-query embeddings (0 disables), persisted across
+    # restarts in this file (None disables)
+    embed_cache_size: int = 4096
+    embed_cache_file: str | None = "data/query_embeddings.npz"
+
+    # Exact-match response cache (normalized query text)
+    response_cache_size: int = 1024
+    # Semantic response cache (paraphrased queries)
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_size: int = 4096
+
+    # Max OCR worker processes (None = one per CPU core)
+    ocr_concurrency: int | None = None
+    # OCR text per (pdf content hash, page); None disables the cache
+    ocr_cache_dir: str | None = "data/ocr_cache"
 
     allow_origins: str = "http://localhost:5173"
 
@@ -1,15 +1,50 @@
 from __future__ import annotations
 
+import json
+import re
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, AsyncIterator
+
+import numpy as np
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.config import settings
-from app.rag.answer import build_answer
+from app.rag.answer import build_answer, build_sources, classify_intent, safety_redirect_response
 from app.rag.retriever import Retriever
+from app.rag.semcache import LRUCache, SemanticCache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.embed_cache_file:
+        await run_in_threadpool(retriever.embedder.load_query_cache, settings.embed_cache_file)
+    await _warm_up()
+    yield
+    if settings.embed_cache_file:
+        await run_in_threadpool(retriever.embedder.save_query_cache, settings.embed_cache_file)
+    await retriever.client.close()
 
 
-app = FastAPI(title="Creta Emergency Assistant — Prototype v1 (Qdrant)")
+async def _warm_up() -> None:
+    """
+    Run one retrieval at boot so ONNX Runtime session setup and the Qdrant
+    connection are paid before the first user request.
+    """
+    try:
+        await retriever.retrieve("jump start battery", top_k=1)
+    except Exception:
+        # Model or collection not ready yet; real requests will report it.
+        pass
+
+
+# Every route declares a response model or return type, so FastAPI (>= 0.130)
+# serializes responses straight to JSON bytes in pydantic-core. Setting a
+# default_response_class (e.g. ORJSONResponse) would switch that fast path off.
+app = FastAPI(title="Creta Emergency Assistant — Prototype v1 (Qdrant)", lifespan=lifespan)
 
 origins = [o.strip() for o in (settings.allow_origins or "").split(",") if o.strip()]
 app.add_middleware(
@@ -24,6 +59,15 @@ app.add_middleware(
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=3, description="Natural language emergency description")
     top_k: int | None = Field(None, ge=1, le=10)
+    include_source_text: bool = Field(
+        False, description="Include full excerpt text in sources (otherwise fetch via /chunk/{chunk_id})"
+    )
+
+
+class QueryBatchRequest(BaseModel):
+    queries: list[Annotated[str, Field(min_length=3)]] = Field(..., min_length=1, max_length=512)
+    top_k: int | None = Field(None, ge=1, le=10)
+    include_source_text: bool = False
 
 
 class QueryResponse(BaseModel):
@@ -35,7 +79,166 @@ class QueryResponse(BaseModel):
     disclaimer: str
 
 
+class QueryBatchResponse(BaseModel):
+    # One entry per input query, in order; null where no manual section matched.
+    results: list[QueryResponse | None]
+
+
+class ChunkResponse(BaseModel):
+    id: str
+    chunk_id: str | None
+    page: int
+    section: str | None
+    scenario: str | None
+    text: str
+
+
 retriever = Retriever()
+response_cache = LRUCache(maxsize=settings.response_cache_size)
+semantic_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_size,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+NOT_FOUND_DETAIL = "No relevant manual sections found. Did you run ingestion?"
+
+
+def _normalize_query(query: str) -> str:
+    return _WHITESPACE_RE.sub(" ", query.strip().lower())
+
+
+def _answer_without_retrieval(
+    norm_query: str, top_k: int, include_source_text: bool
+) -> tuple[dict | None, tuple]:
+    """
+    Exact-match response cache: repeated questions skip embedding and Qdrant.
+    The safety redirect needs no manual context either.
+
+    Returns (answer, None) when one of those applies, else (None, namespace)
+    for the semantic cache, which answers paraphrases of earlier questions
+    (same intent, top_k and source-text flag) from a single embedding.
+    """
+    answer = response_cache.get((norm_query, top_k, include_source_text))
+    if answer is not None:
+        return answer, None
+
+    intent = classify_intent(norm_query)
+    if intent == "malicious":
+        return safety_redirect_response(norm_query), None
+
+    return None, (intent, top_k, include_source_text)
+
+
+def _remember_answer(
+    norm_query: str, namespace: tuple, query_vector: np.ndarray, answer: dict, fresh: bool
+) -> None:
+    # Only found answers get here: misses (404) are never cached.
+    if fresh:
+        semantic_cache.put(namespace, query_vector, answer)
+    _, top_k, include_source_text = namespace
+    response_cache.put((norm_query, top_k, include_source_text), answer)
+
+
+async def _answer_frames(
+    norm_query: str, top_k: int, include_source_text: bool, stream: bool = True
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Answer a query in phases, as (phase, payload) pairs: ("initial", sources)
+    once the broad query is ranked (only with `stream`), then ("final",
+    answer), or ("error", detail) when no manual section matches.
+    Cache hits and the safety redirect go straight to "final".
+    """
+    answer, namespace = _answer_without_retrieval(norm_query, top_k, include_source_text)
+    if answer is not None:
+        yield "final", answer
+        return
+
+    query_vector = await retriever.embedder.embed_one_async(norm_query)
+
+    answer = semantic_cache.get(namespace, query_vector)
+    fresh = answer is None
+    if fresh:
+        if stream:
+            chunks = []
+            async for phase, chunks in retriever.retrieve_stream(
+                norm_query, top_k=top_k, query_vector=query_vector
+            ):
+                if phase == "initial" and chunks:
+                    yield "initial", build_sources(chunks, include_source_text)
+        else:
+            chunks = await retriever.retrieve(norm_query, top_k=top_k, query_vector=query_vector)
+
+        if not chunks:
+            yield "error", NOT_FOUND_DETAIL
+            return
+
+        answer = build_answer(norm_query, chunks, include_source_text=include_source_text)
+
+    _remember_answer(norm_query, namespace, query_vector, answer, fresh)
+    yield "final", answer
+
+
+async def _answer_cached(norm_query: str, top_k: int, include_source_text: bool) -> dict:
+    """
+    The final answer of `_answer_frames`; a miss raises 404.
+    """
+    # Without `stream` the only frame is "final" or "error"
+    async for phase, payload in _answer_frames(norm_query, top_k, include_source_text, stream=False):
+        pass
+
+    if phase == "error":
+        raise HTTPException(status_code=404, detail=payload)
+    return payload
+
+
+async def _answer_batch_cached(
+    norm_queries: list[str], top_k: int, include_source_text: bool
+) -> list[dict | None]:
+    """
+    Batched `_answer_cached` with the same caching rules: cache misses share
+    one embedding call and one Qdrant round-trip. Queries with no relevant
+    section yield None.
+    """
+    answers: list[dict | None] = [None] * len(norm_queries)
+    pending: list[tuple[int, str, tuple]] = []
+
+    for i, norm_query in enumerate(norm_queries):
+        answer, namespace = _answer_without_retrieval(norm_query, top_k, include_source_text)
+        if answer is None:
+            pending.append((i, norm_query, namespace))
+        else:
+            answers[i] = answer
+
+    if not pending:
+        return answers
+
+    vectors = await run_in_threadpool(retriever.embedder.embed, [q for _, q, _ in pending])
+
+    misses = []
+    for (i, norm_query, namespace), vector in zip(pending, vectors):
+        answer = semantic_cache.get(namespace, vector)
+        if answer is None:
+            misses.append((i, norm_query, namespace, vector))
+        else:
+            _remember_answer(norm_query, namespace, vector, answer, fresh=False)
+            answers[i] = answer
+
+    if misses:
+        results = await retriever.retrieve_many(
+            [q for _, q, _, _ in misses],
+            top_k=top_k,
+            query_vectors=np.stack([v for _, _, _, v in misses]),
+        )
+        for (i, norm_query, namespace, vector), chunks in zip(misses, results):
+            if not chunks:
+                continue
+            answer = build_answer(norm_query, chunks, include_source_text=include_source_text)
+            _remember_answer(norm_query, namespace, vector, answer, fresh=True)
+            answers[i] = answer
+
+    return answers
 
 
 @app.get("/health")
@@ -43,14 +246,68 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@app.post("/cache/clear")
+def cache_clear() -> dict:
+    cleared = len(response_cache)
+    response_cache.clear()
+    semantic_cache.clear()
+    return {"status": "ok", "cleared": cleared}
+
+
 @app.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest) -> dict:
+async def query(req: QueryRequest) -> dict:
     try:
         top_k = req.top_k or settings.top_k
-        chunks = retriever.retrieve(req.query, top_k=top_k)
-        if not chunks:
-            raise HTTPException(status_code=404, detail="No relevant manual sections found. Did you run ingestion?")
-        return build_answer(req.query, chunks)
+        answer = await _answer_cached(_normalize_query(req.query), top_k, req.include_source_text)
+        return {**answer, "query": req.query}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/query/stream")
+async def query_stream(req: QueryRequest) -> StreamingResponse:
+    """
+    /query as newline-delimited JSON frames (see `_answer_frames`), so a
+    client can show sources before the full answer is assembled.
+    """
+    top_k = req.top_k or settings.top_k
+    frames = _answer_frames(_normalize_query(req.query), top_k, req.include_source_text)
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for phase, payload in frames:
+                if phase == "initial":
+                    frame = {"phase": phase, "sources": payload}
+                elif phase == "final":
+                    frame = {"phase": phase, **payload, "query": req.query}
+                else:
+                    frame = {"phase": phase, "status": 404, "detail": payload}
+                yield json.dumps(frame, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"phase": "error", "status": 500, "detail": str(e)}) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.post("/query_batch", response_model=QueryBatchResponse)
+async def query_batch(req: QueryBatchRequest) -> dict:
+    """
+    Answer many queries in one request (e.g. the eval runner). Unlike /query,
+    a query without relevant manual sections gives null instead of a 404.
+    """
+    try:
+        top_k = req.top_k or settings.top_k
+        answers = await _answer_batch_cached(
+            [_normalize_query(q) for q in req.queries], top_k, req.include_source_text
+        )
+        return {
+            "results": [
+                None if answer is None else {**answer, "query": q}
+                for q, answer in zip(req.queries, answers)
+            ]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -63,19 +320,42 @@ PRE_DRIVE_QUERY = (
 
 
 @app.get("/pre-drive-check", response_model=QueryResponse)
-def pre_drive_check() -> dict:
+async def pre_drive_check(include_source_text: bool = False) -> dict:
     """
     Proactive safety checklist before starting or during a long drive.
     No user input required.
     """
     try:
-        chunks = retriever.retrieve(PRE_DRIVE_QUERY, top_k=settings.top_k,intent="pre_drive",)
+        chunks = await retriever.retrieve(PRE_DRIVE_QUERY, top_k=settings.top_k,intent="pre_drive",)
         if not chunks:
             raise HTTPException(
                 status_code=404,
                 detail="No relevant manual sections found for pre-drive check.",
             )
-        return build_answer(PRE_DRIVE_QUERY, chunks)
+        return build_answer(PRE_DRIVE_QUERY, chunks, include_source_text=include_source_text)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/chunk/{chunk_id}", response_model=ChunkResponse)
+async def get_chunk(chunk_id: str) -> dict:
+    """
+    Full excerpt text for one source, for clients that skipped it in /query.
+    """
+    try:
+        chunk = await retriever.get_chunk(chunk_id)
+        if chunk is None:
+            raise HTTPException(status_code=404, detail=f"Chunk not found: {chunk_id}")
+        return {
+            "id": chunk.id,
+            "chunk_id": chunk.metadata.get("chunk_id"),
+            "page": int(chunk.metadata.get("page") or -1),
+            "section": chunk.metadata.get("section"),
+            "scenario": chunk.metadata.get("scenario"),
+            "text": chunk.text,
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Pattern, Sequence, Set
 
 from app.rag.retriever import RetrievedChunk
 
 
+NUM_STEP_RE = re.compile(r"^\d+\.\s+")
+BLANK_RE = re.compile(r"\n\s*\n")
+WARN_RE = re.compile(r"(?:WARNING|CAUTION|NOTICE)", re.IGNORECASE)
+
+
 # ---------------------------------------------------------
 # Conservative tool keywords (manual-faithful)
 # ---------------------------------------------------------
@@ -25,22 +30,39 @@ TOOL_KEYWORDS = [
 # ---------------------------------------------------------
 # Intent classification (NO hardcoded scenarios)
 # ---------------------------------------------------------
+HARMFUL_VERBS = [
+    "make", "cause", "damage", "break",
+    "puncture", "sabotage", "destroy",
+]
+VEHICLE_TARGETS = [
+    "tyre", "tire", "engine", "battery",
+    "vehicle", "car",
+]
+
+
+def _keyword_pattern(keywords: Sequence[str]) -> Pattern[str]:
+    """
+    Compile keywords into one alternation (longest first) so a text is
+    scanned once by the C regex engine.
+    """
+    unique = list(dict.fromkeys(keywords))
+    return re.compile(
+        "|".join(re.escape(k) for k in sorted(unique, key=len, reverse=True))
+    )
+
+
+# Substring semantics, like the original `v in q` checks
+HARMFUL_RE = _keyword_pattern(HARMFUL_VERBS)
+TARGET_RE = _keyword_pattern(VEHICLE_TARGETS)
+
+
 def classify_intent(query: str) -> str:
     """
     Classify user intent to prevent harmful instructions.
     """
     q = query.lower()
 
-    harmful_verbs = {
-        "make", "cause", "damage", "break",
-        "puncture", "sabotage", "destroy"
-    }
-    vehicle_targets = {
-        "tyre", "tire", "engine", "battery",
-        "vehicle", "car"
-    }
-
-    if any(v in q for v in harmful_verbs) and any(t in q for t in vehicle_targets):
+    if HARMFUL_RE.search(q) and TARGET_RE.search(q):
         return "malicious"
 
     return "assistance"
@@ -77,15 +99,16 @@ def safety_redirect_response(query: str) -> Dict:
 # ---------------------------------------------------------
 def _best_chunk_for_query(query: str, chunks: List[RetrievedChunk]) -> RetrievedChunk:
     q = query.lower()
+    terms = q.split()
 
     def score_chunk(c: RetrievedChunk) -> float:
         score = c.score
-        text = c.text.lower()
+        text = c.text_lower
 
         if q in text:
             score += 1.5
 
-        for term in q.split():
+        for term in terms:
             if term in text:
                 score += 0.2
 
@@ -97,14 +120,17 @@ def _best_chunk_for_query(query: str, chunks: List[RetrievedChunk]) -> Retrieved
 # ---------------------------------------------------------
 # Query-aware text filtering
 # ---------------------------------------------------------
-def _filter_relevant_blocks(text: str, query: str) -> str:
+def _filter_relevant_blocks(chunk: RetrievedChunk, query: str) -> str:
     q_terms = [t for t in query.lower().split() if len(t) > 2]
 
-    blocks = re.split(r"\n\s*\n", text)
+    text = chunk.text
+    # Lower-casing never adds or removes whitespace, so both splits align.
+    blocks = BLANK_RE.split(text)
+    blocks_lower = BLANK_RE.split(chunk.text_lower)
     relevant: List[str] = []
 
-    for block in blocks:
-        if any(term in block.lower() for term in q_terms):
+    for block, block_lower in zip(blocks, blocks_lower):
+        if any(term in block_lower for term in q_terms):
             relevant.append(block.strip())
 
     return "\n\n".join(relevant) if relevant else text
@@ -116,10 +142,13 @@ def _filter_relevant_blocks(text: str, query: str) -> str:
 def _extract_numbered_steps(text: str) -> List[str]:
     steps: List[str] = []
 
-    for ln in text.splitlines():
-        ln = ln.strip()
-        if re.match(r"^\d+\.\s+", ln):
-            steps.append(re.sub(r"^\d+\.\s+", "", ln))
+    for raw in text.splitlines():
+        ln = raw.strip()
+        if not ln:
+            continue
+        m = NUM_STEP_RE.match(ln)
+        if m:
+            steps.append(ln[m.end():])
 
     return steps
 
@@ -128,38 +157,58 @@ def _extract_warning_lines(text: str) -> List[str]:
     warnings: List[str] = []
 
     for ln in text.splitlines():
-        u = ln.strip().upper()
-        if u.startswith(("WARNING", "CAUTION", "NOTICE")):
-            warnings.append(ln.strip())
+        s = ln.strip()
+        if s and WARN_RE.match(s):
+            warnings.append(s)
 
-    seen = set()
-    out = []
-    for w in warnings:
-        if w not in seen:
-            seen.add(w)
-            out.append(w)
+    return list(dict.fromkeys(warnings))
 
-    return out
 
+def _extract_tools(chunks: List[RetrievedChunk]) -> List[str]:
+    found: Set[str] = set()
 
-def _extract_tools(texts: List[str]) -> List[str]:
-    haystack = " ".join(texts).lower()
-    found: List[str] = []
+    # Plain substring checks chunk by chunk (no joined copy); keywords
+    # already found are skipped, and the scan stops once all are found.
+    for c in chunks:
+        text = c.text_lower
+        found.update(kw for kw in TOOL_KEYWORDS if kw not in found and kw in text)
+        if len(found) == len(TOOL_KEYWORDS):
+            break
 
-    for kw in TOOL_KEYWORDS:
-        if kw in haystack:
-            found.append(kw)
-
-    seen = set()
-    return [t for t in found if not (t in seen or seen.add(t))]
+    return [kw for kw in TOOL_KEYWORDS if kw in found]
 
 
 # ---------------------------------------------------------
 # Public API
 # ---------------------------------------------------------
-def build_answer(query: str, chunks: List[RetrievedChunk]) -> Dict:
+def build_sources(chunks: List[RetrievedChunk], include_source_text: bool = True) -> List[Dict]:
+    """
+    Source entries as they appear in an answer.
+    """
+    sources = []
+    for c in chunks:
+        source = {
+            "id": c.id,
+            "page": int(c.metadata.get("page") or -1),
+            "chunk_id": c.metadata.get("chunk_id"),
+        }
+        if include_source_text:
+            source["text"] = c.text
+        source["score"] = c.score
+        sources.append(source)
+    return sources
+
+
+def build_answer(
+    query: str,
+    chunks: List[RetrievedChunk],
+    include_source_text: bool = True,
+) -> Dict:
     """
     Build a precise, safe, scenario-correct answer.
+
+    With `include_source_text=False` sources carry only id/page/chunk_id/score,
+    which keeps responses (and cached answers) small.
     """
     # -----------------------------------------------------
     # 0. Intent safety gate
@@ -188,28 +237,19 @@ def build_answer(query: str, chunks: List[RetrievedChunk]) -> Dict:
     # -----------------------------------------------------
     # 2. Filter content by query intent
     # -----------------------------------------------------
-    focused_text = _filter_relevant_blocks(best_chunk.text, query)
+    focused_text = _filter_relevant_blocks(best_chunk, query)
 
     # -----------------------------------------------------
     # 3. Extract structured outputs
     # -----------------------------------------------------
     steps = _extract_numbered_steps(focused_text)
     warnings = _extract_warning_lines(focused_text)
-    tools = _extract_tools([c.text for c in chunks])
+    tools = _extract_tools(chunks)
 
     # -----------------------------------------------------
     # 4. Sources (transparent)
     # -----------------------------------------------------
-    sources = [
-        {
-            "id": c.id,
-            "page": int(c.metadata.get("page") or -1),
-            "chunk_id": c.metadata.get("chunk_id"),
-            "text": c.text,
-            "score": c.score,
-        }
-        for c in chunks
-    ]
+    sources = build_sources(chunks, include_source_text)
 
     return {
         "query": query,
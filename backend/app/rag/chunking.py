@@ -11,12 +11,9 @@ def simple_char_chunks(text: str, chunk_size: int = 1100, overlap: int = 200) ->
     if chunk_size <= overlap:
         raise ValueError("chunk_size must be > overlap")
 
-    chunks: List[str] = []
-    start = 0
-    while start < len(text):
-        end = min(len(text), start + chunk_size)
-        chunks.append(text[start:end].strip())
-        if end == len(text):
-            break
-        start = max(0, end - overlap)
-    return [c for c in chunks if c]
+    step = chunk_size - overlap
+    # Window starts are known up front: the last one is the first window
+    # that reaches the end of the text, so no trailing micro-chunk is made.
+    last_start = max(0, -(-(len(text) - chunk_size) // step)) * step
+    windows = (text[start:start + chunk_size].strip() for start in range(0, last_start + 1, step))
+    return [w for w in windows if w]
@@ -1,31 +1,235 @@
 from __future__ import annotations
 
+import asyncio
+import os
 from dataclasses import dataclass
 from typing import List
 
 import numpy as np
 from fastembed import TextEmbedding
 
+from app.rag.semcache import LRUCache
+
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
 
 @dataclass
 class FastEmbedder:
     """Lightweight embedding wrapper for MVP.
 
     Uses FastEmbed (ONNX Runtime under the hood). Good for Windows + Python 3.13.
+
+    `embed_one_async` coalesces concurrent callers: requests arriving within
+    `batch_window_ms` of each other (up to `max_batch`) share one forward pass.
+
+    Single-query embeddings are memoized per text (`cache_size` entries,
+    0 disables), keyed with runs of whitespace collapsed since the tokenizer
+    ignores them; cached vectors are read-only. `save_query_cache` /
+    `load_query_cache` carry the memo across process restarts.
+
+    If `model_path` points to an INT8 export produced by `app.rag.quantize`,
+    that graph is loaded instead of the stock FastEmbed download.
     """
     model_name: str
+    batch_window_ms: float = 8.0
+    max_batch: int = 32
+    threads: int | None = None
+    model_path: str | None = None
+    cache_size: int = 4096
+    # Bulk embedding knobs (ingestion): `parallel` spawns FastEmbed workers
+    # (0 = one per core) once a call has more than `batch_size` texts;
+    # `lazy_load` keeps the parent process from loading its own copy.
+    batch_size: int = 256
+    parallel: int | None = None
+    lazy_load: bool = False
 
     def __post_init__(self) -> None:
-        self._model = TextEmbedding(model_name=self.model_name)
+        self._query_cache = LRUCache(self.cache_size)
+        if self.model_path:
+            self._model = TextEmbedding(
+                model_name=_register_quantized(self.model_name),
+                specific_model_path=self.model_path,
+                threads=self.threads,
+                lazy_load=self.lazy_load,
+            )
+        else:
+            self._model = TextEmbedding(
+                model_name=self.model_name,
+                threads=self.threads,
+                lazy_load=self.lazy_load,
+            )
+        self._batch_loop: asyncio.AbstractEventLoop | None = None
+        self._batch_queue: asyncio.Queue | None = None
+        self._batch_task: asyncio.Task | None = None
 
     @property
     def dim(self) -> int:
         v = next(self._model.embed(["dim probe"]))
         return int(len(v))
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        vecs = list(self._model.embed(texts))
-        return [np.asarray(v, dtype=np.float32).tolist() for v in vecs]
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a contiguous float32 matrix of shape (len(texts), dim).
+
+        Rows are L2-normalized, so a dot product equals cosine similarity
+        (collections are created with Distance.DOT). Rows go to Qdrant as-is;
+        convert with `.tolist()` only at an edge that needs plain Python floats.
+        """
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        # Rows are written straight into one preallocated matrix (no list of
+        # row arrays + vstack copy); FastEmbed batches by `batch_size` inside.
+        arr: np.ndarray | None = None
+        rows = self._model.embed(texts, batch_size=self.batch_size, parallel=self.parallel)
+        for i, v in enumerate(rows):
+            if arr is None:
+                arr = np.empty((len(texts), len(v)), dtype=np.float32)
+            arr[i] = v
+        arr /= np.linalg.norm(arr, axis=1, keepdims=True) + 1e-12
+        return arr
+
+    def embed_one(self, text: str) -> np.ndarray:
+        key = _cache_key(text)
+        vector = self._query_cache.get(key)
+        if vector is None:
+            vector = self._remember(key, self.embed([text])[0])
+        return vector
+
+    async def embed_one_async(self, text: str) -> np.ndarray:
+        key = _cache_key(text)
+        vector = self._query_cache.get(key)
+        if vector is not None:
+            return vector
+
+        loop = asyncio.get_running_loop()
+
+        # The queue and worker are bound to the loop that created them.
+        if self._batch_loop is not loop:
+            self._batch_loop = loop
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = loop.create_task(self._batch_worker(self._batch_queue))
+
+        fut = loop.create_future()
+        await self._batch_queue.put((text, fut))
+        return self._remember(key, await fut)
+
+    def save_query_cache(self, path: str) -> int:
+        """
+        Write the memoized query embeddings to an .npz file; returns the count.
+        """
+        items = self._query_cache.items()
+        if not items:
+            return 0
+
+        keys, vectors = zip(*items)
+        # Keys go in as one UTF-8 blob plus offsets: a fixed-width string
+        # array would pad every key to the longest query.
+        encoded = [k.encode("utf-8") for k in keys]
+        offsets = np.cumsum([0, *map(len, encoded)], dtype=np.int64)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # np.savez appends .npz to names without it, so keep the suffix last
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp,
+            model=np.array(self._cache_model_id()),
+            keys=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            key_offsets=offsets,
+            vectors=np.stack(vectors),
+        )
+        os.replace(tmp, path)
+        return len(keys)
+
+    def load_query_cache(self, path: str) -> int:
+        """
+        Reload embeddings written by `save_query_cache`; returns the count.
+
+        A missing or unreadable file, or one written for another model,
+        is ignored.
+        """
+        try:
+            data = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return 0
+
+        with data:
+            if "key_offsets" not in data or str(data["model"]) != self._cache_model_id():
+                return 0
+            blob = data["keys"].tobytes()
+            offsets = data["key_offsets"].tolist()
+            keys = [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+            # Saved least recently used first, so recency order is restored
+            for key, vector in zip(keys, data["vectors"]):
+                self._remember(key, vector)
+        return len(keys)
+
+    def _cache_model_id(self) -> str:
+        return f"{self.model_name}|{self.model_path or ''}"
+
+    def _remember(self, key: str, vector: np.ndarray) -> np.ndarray:
+        vector = vector.copy()
+        vector.flags.writeable = False
+        self._query_cache.put(key, vector)
+        return vector
+
+    async def _batch_worker(self, queue: asyncio.Queue) -> None:
+        window = self.batch_window_ms / 1000.0
+
+        while True:
+            batch = [await queue.get()]
+            if window > 0:
+                await asyncio.sleep(window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                # Inference is CPU-bound; keep it off the event loop.
+                vectors = await asyncio.to_thread(self.embed, [t for t, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), vector in zip(batch, vectors):
+                if not fut.done():
+                    fut.set_result(vector)
+
+
+def _cache_key(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _register_quantized(model_name: str) -> str:
+    """
+    Register the INT8 variant of `model_name` with FastEmbed and return its name.
+
+    Dimension and weights source come from the stock model description.
+    FastEmbed's model descriptions don't expose pooling, so only the BGE
+    family (CLS pooling, L2-normalized outputs) is accepted.
+    """
+    from fastembed.common.model_description import ModelSource, PoolingType
+
+    name = f"{model_name}-int8"
+    supported = {m["model"].lower(): m for m in TextEmbedding.list_supported_models()}
+    if name.lower() in supported:
+        return name
+
+    base = supported.get(model_name.lower())
+    if base is None:
+        raise ValueError(f"Unknown base embedding model: {model_name}")
+    if not model_name.lower().startswith("baai/bge-"):
+        raise ValueError(
+            f"INT8 export is only supported for BAAI/bge-* models, got {model_name}"
+        )
 
-    def embed_one(self, text: str) -> List[float]:
-        return self.embed([text])[0]
+    TextEmbedding.add_custom_model(
+        model=name,
+        pooling=PoolingType.CLS,
+        normalization=True,
+        sources=ModelSource(hf=base["sources"]["hf"]),
+        dim=base["dim"],
+        model_file=QUANTIZED_MODEL_FILE,
+    )
+    return name
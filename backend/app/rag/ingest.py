@@ -1,18 +1,39 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import hashlib
 import os
 import re
-import uuid
-from typing import List
-
-import fitz
-from qdrant_client.models import Distance, PointStruct, VectorParams
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Iterable, Iterator, List
+
+import numpy as np
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    PayloadSchemaType,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
 
 from app.config import settings
 from app.rag.embeddings import FastEmbedder
-from app.rag.qdrant_db import get_client, get_qdrant_config
-from app.rag.pdf_ocr import extract_pages_ocr
+from app.rag.qdrant_db import deterministic_uuid, get_client, get_qdrant_config
+
+if TYPE_CHECKING:
+    import fitz
 
 
 # ---------------------------------------------------------
@@ -23,46 +44,96 @@ EMERGENCY_SECTION = {
     "start_page": 388,
     "end_page": 412,
 }
+SECTION_NAME = EMERGENCY_SECTION["name"]
+
+DOTS_RE = re.compile(r"\.{3,}")
+REPEAT_RE = re.compile(r"(.)\1{4,}")
+NUMBERED_RE = re.compile(r"^\d+\.")
+JUNK_RE = re.compile(r"[\\ȿƌǿ]")
 
 
 # ---------------------------------------------------------
 # Utilities
 # ---------------------------------------------------------
-def deterministic_uuid(text_id: str) -> str:
-    return str(uuid.uuid5(uuid.NAMESPACE_URL, text_id))
-
-
 def is_garbled(text: str) -> bool:
     if not text:
         return True
-    alpha_ratio = sum(c.isalpha() for c in text) / max(len(text), 1)
-    junk_patterns = ["\\", "ȿ", "ƌ", "ǿ"]
-    return alpha_ratio < 0.5 or any(j in text for j in junk_patterns)
+    if JUNK_RE.search(text):
+        return True
+    alpha_ratio = sum(map(str.isalpha, text)) / len(text)
+    return alpha_ratio < 0.5
 
 
 def clean_ocr_text(text: str) -> str:
     """
     Light OCR cleanup WITHOUT destroying structure.
     """
-    lines = []
+    # Substitutions only ever shorten a line, so lines of <= 20 chars can be
+    # dropped before them; the survivors are rewritten in one pass each.
+    kept = []
     for line in text.splitlines():
         line = line.strip()
+        if len(line) > 20 and len(set(line)) > 3:
+            kept.append(line)
 
-        if len(set(line)) <= 3 and len(line) > 20:
-            continue
-
-        line = re.sub(r"\.{3,}", " ", line)
-        line = re.sub(r"(.)\1{4,}", r"\1", line)
-
-        if len(line) > 20:
-            lines.append(line)
-
-    return "\n".join(lines)
+    joined = REPEAT_RE.sub(r"\1", DOTS_RE.sub(" ", "\n".join(kept)))
+    return "\n".join(line for line in joined.split("\n") if len(line) > 20)
 
 
 # ---------------------------------------------------------
 # Structural chunking (NO hardcoding)
 # ---------------------------------------------------------
+class StructuralBlockSplitter:
+    """
+    Incremental form of `split_structural_blocks`.
+
+    Text can be fed in segments (e.g. one page at a time); a block that
+    continues across segments is only emitted once the next heading or
+    `close()` ends it.
+    """
+
+    def __init__(self) -> None:
+        self._current: list[str] = []
+
+    def feed(self, text: str) -> Iterator[str]:
+        """
+        Yield the blocks completed by `text`. Consume the iterator fully
+        before feeding the next segment.
+        """
+        current = self._current
+
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line:
+                continue
+
+            # A line starting with an uppercase letter cannot also be a
+            # numbered step, so no NUMBERED_RE check is needed here.
+            if current and line[0].isupper():
+                block = "\n".join(current).lstrip()
+                current.clear()
+                if len(block) > 80:
+                    yield block
+
+            current.append(line)
+
+    def close(self) -> Iterator[str]:
+        block = "\n".join(self._current).lstrip()
+        self._current = []
+        if len(block) > 80:
+            yield block
+
+
+def iter_structural_blocks(segments: Iterable[str]) -> Iterator[str]:
+    """
+    Lazily split a stream of text segments (e.g. pages) into blocks.
+    """
+    splitter = StructuralBlockSplitter()
+    for text in segments:
+        yield from splitter.feed(text)
+    yield from splitter.close()
+
+
 def split_structural_blocks(text: str) -> list[str]:
     """
     Split structured manuals into semantic blocks.
@@ -74,29 +145,7 @@ def split_structural_blocks(text: str) -> list[str]:
 
     Works for TXT, OCR, and PDF-extracted manuals.
     """
-    blocks = []
-    current = []
-
-    for line in text.splitlines():
-        line = line.rstrip()
-
-        is_heading = (
-            line
-            and not re.match(r"^\d+\.", line)
-            and line[0].isupper()
-        )
-
-        if is_heading and current:
-            blocks.append("\n".join(current).strip())
-            current = []
-
-        if line:
-            current.append(line)
-
-    if current:
-        blocks.append("\n".join(current).strip())
-
-    return [b for b in blocks if len(b) > 80]
+    return list(iter_structural_blocks([text]))
 
 
 def extract_heading(block: str) -> str | None:
@@ -104,7 +153,7 @@ def extract_heading(block: str) -> str | None:
     Extract the first non-numbered line as scenario title.
     """
     for line in block.splitlines():
-        if line and not re.match(r"^\d+\.", line):
+        if line and not NUMBERED_RE.match(line):
             return line.strip()
     return None
 
@@ -112,50 +161,353 @@ def extract_heading(block: str) -> str | None:
 # ---------------------------------------------------------
 # PDF extraction (hybrid native + OCR)
 # ---------------------------------------------------------
-def extract_part8_text(pdf_path: str, start_page: int, end_page: int) -> str:
-    doc = fitz.open(pdf_path)
-    pages: List[str] = []
+_open_docs: dict[str, fitz.Document] = {}
 
-    for page_num in range(start_page - 1, end_page):
-        page = doc[page_num]
-        native_text = page.get_text("text").strip()
 
-        if len(native_text) < 200 or is_garbled(native_text):
-            ocr_text = extract_pages_ocr(
-                pdf_path=pdf_path,
-                start_page=page_num + 1,
-                end_page=page_num + 1,
-            )
-            combined = ocr_text
-        else:
-            combined = native_text
+def _page_doc(pdf_path: str) -> fitz.Document:
+    """
+    One open document per worker process (fitz documents cannot be pickled).
+    """
+    doc = _open_docs.get(pdf_path)
+    if doc is None:
+        import fitz
 
-        combined = clean_ocr_text(combined)
+        doc = _open_docs[pdf_path] = fitz.open(pdf_path)
+    return doc
 
-        if combined:
-            pages.append(combined)
 
-    if not pages:
-        raise RuntimeError("No usable text extracted from PDF")
+def _native_page_text(page: fitz.Page) -> str:
+    """
+    Native text of a page from MuPDF's block tuples
+    (x0, y0, x1, y1, text, block_no, block_type); image blocks are skipped.
+    """
+    return "\n".join(b[4].rstrip("\n") for b in page.get_text("blocks") if b[6] == 0).strip()
 
-    return "\n\n".join(pages)
+
+def _is_digital_pdf(pdf_path: str, page_nums: range, sample: int = 5) -> bool:
+    """
+    Classify the page range once: if evenly spaced sample pages all carry
+    plenty of clean native text, the document is digital and needs no OCR.
+    """
+    import fitz
+
+    step = max(1, len(page_nums) // sample)
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_nums[::step][:sample]:
+            text = _native_page_text(doc[page_num])
+            if len(text) <= 500 or is_garbled(text):
+                return False
+    return True
+
+
+def _pdf_digest(pdf_path: str) -> str:
+    with open(pdf_path, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+def _ocr_page_cached(page: fitz.Page, cache_dir: str | None, pdf_hash: str | None) -> str:
+    """
+    OCR a page, reusing text cached on disk under cache_dir/pdf_hash/page.txt.
+    """
+    cache_file = None
+    if cache_dir and pdf_hash:
+        cache_file = os.path.join(cache_dir, pdf_hash, f"{page.number}.txt")
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return f.read()
+
+    # OCR stack (Tesseract/Pillow) is only loaded when a page needs it
+    from app.rag.pdf_ocr import ocr_page
+
+    # Rasterize from the page already open in this worker
+    text = ocr_page(page)
+
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, cache_file)
+
+    return text
+
+
+def _extract_one_page(
+    pdf_path: str,
+    page_num: int,
+    use_ocr: bool = True,
+    pdf_hash: str | None = None,
+) -> tuple[int, str]:
+    try:
+        return _extract_page_text(pdf_path, page_num, use_ocr, pdf_hash)
+    except Exception as e:
+        # Worker exceptions travel back pickled, and some (e.g.
+        # pytesseract.TesseractNotFoundError) cannot be rebuilt; the pool
+        # would then only report BrokenProcessPool.
+        raise RuntimeError(f"page {page_num + 1}: {e}") from e
+
+
+def _extract_page_text(
+    pdf_path: str,
+    page_num: int,
+    use_ocr: bool,
+    pdf_hash: str | None,
+) -> tuple[int, str]:
+    page = _page_doc(pdf_path)[page_num]
+    native_text = _native_page_text(page)
+
+    if use_ocr and (len(native_text) < 200 or is_garbled(native_text)):
+        combined = _ocr_page_cached(page, settings.ocr_cache_dir, pdf_hash)
+    else:
+        combined = native_text
+
+    return page_num, clean_ocr_text(combined)
+
+
+def extract_part8_text(pdf_path: str, start_page: int, end_page: int) -> Iterator[str]:
+    """
+    Yield the cleaned text of each non-empty page, in page order.
+
+    Pages are streamed so the chunker can start before extraction finishes;
+    nothing holds the whole section as one string.
+    """
+    page_nums = range(start_page - 1, end_page)
+    use_ocr = not _is_digital_pdf(pdf_path, page_nums)
+    pdf_hash = _pdf_digest(pdf_path) if use_ocr and settings.ocr_cache_dir else None
+
+    extract = partial(_extract_one_page, pdf_path, use_ocr=use_ocr, pdf_hash=pdf_hash)
+
+    if not use_ocr:
+        # Native text only: cheap in-process, whereas spawned workers
+        # (Windows) would each re-import the embedding stack.
+        try:
+            for _, text in map(extract, page_nums):
+                if text:
+                    yield text
+        finally:
+            doc = _open_docs.pop(pdf_path, None)
+            if doc is not None:
+                doc.close()
+        return
+
+    # Pages are independent and OCR is CPU-bound; map() keeps page order.
+    workers = max(1, min(settings.ocr_concurrency or os.cpu_count() or 1, len(page_nums)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _, text in pool.map(extract, page_nums):
+            if text:
+                yield text
 
 
 # ---------------------------------------------------------
 # Core ingestion helpers
 # ---------------------------------------------------------
-def _create_collection(client, collection_name: str, dim: int) -> None:
+HNSW_M = 16
+INDEXING_THRESHOLD_KB = 10000  # Qdrant server default
+PAYLOAD_INDEX_FIELDS = ("chunk_id", "section", "scenario")
+
+
+def _create_collection(client, collection_name: str, dim: int, index_payload: bool = False) -> None:
     if client.collection_exists(collection_name):
         client.delete_collection(collection_name)
 
+    # FastEmbedder returns unit-length vectors, so a plain dot product ranks
+    # exactly like cosine without Qdrant re-normalizing on every comparison.
+    # m=0 and indexing_threshold=0 defer HNSW graph construction and segment
+    # indexing until the bulk load is done (see _build_index).
+    # INT8 scalar quantization keeps a 4x smaller copy of the vectors in RAM
+    # for search; the float32 originals stay on disk for rescoring.
     client.create_collection(
         collection_name=collection_name,
         vectors_config=VectorParams(
             size=dim,
-            distance=Distance.COSINE,
+            distance=Distance.DOT,
+        ),
+        hnsw_config=HnswConfigDiff(m=0),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            ),
         ),
     )
 
+    # Keyword indexes keep payload-filtered lookups (chunk_id, section,
+    # scenario) off the full-scan path. Local mode has no payload indexes.
+    if not index_payload:
+        return
+
+    for field in PAYLOAD_INDEX_FIELDS:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
+
+def _build_index(client, collection_name: str) -> None:
+    """
+    Re-enable HNSW once all points are in, so the graph is built in one pass.
+    """
+    client.update_collection(
+        collection_name=collection_name,
+        hnsw_config=HnswConfigDiff(m=HNSW_M),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD_KB),
+    )
+
+
+def _staging_name(collection_name: str) -> str:
+    return f"{collection_name}-{time.time_ns()}"
+
+
+def _publish_collection(client, alias: str, staging: str) -> None:
+    """
+    Serve the fully built `staging` collection under `alias` (the configured
+    collection name) and drop whatever was served there before.
+
+    The alias switch is one atomic operation, so the old data stays
+    searchable until the new collection is complete. Only a collection
+    stored under `alias` itself (ingested before aliases were used) has to
+    be deleted ahead of the switch.
+    """
+    previous = [a.collection_name for a in client.get_aliases().aliases if a.alias_name == alias]
+
+    operations = []
+    if previous:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    elif client.collection_exists(alias):
+        client.delete_collection(alias)
+    operations.append(
+        CreateAliasOperation(create_alias=CreateAlias(collection_name=staging, alias_name=alias))
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+    for name in previous:
+        if name != staging:
+            client.delete_collection(name)
+
+
+def _drop_collection(client, collection_name: str) -> None:
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+
+
+def _make_embedder(embed_model: str) -> FastEmbedder:
+    return FastEmbedder(
+        embed_model,
+        model_path=settings.embed_model_path,
+        parallel=max(0, (os.cpu_count() or 1) // 2),
+        lazy_load=True,
+    )
+
+
+def _embed_unique(
+    embedder: FastEmbedder,
+    chunks: list[str],
+    seen: dict[str, np.ndarray] | None = None,
+) -> np.ndarray:
+    """
+    Embed `chunks`, running inference once per distinct text.
+
+    Manuals repeat warnings and notes verbatim; duplicates reuse the first
+    vector. Pass the same `seen` dict across calls to dedupe across batches.
+    """
+    seen = {} if seen is None else seen
+    todo = [c for c in dict.fromkeys(chunks) if c not in seen]
+    if todo:
+        seen.update(zip(todo, embedder.embed(todo)))
+    return np.stack([seen[c] for c in chunks])
+
+
+def _make_point(prefix: str, idx: int, chunk: str, vector: List[float]) -> PointStruct:
+    """
+    `vector` should be a plain list (one `ndarray.tolist()` per batch):
+    PointStruct validation walks numpy rows element by element, ~30x slower.
+    """
+    chunk_id = f"{prefix}-c{idx:04d}"
+    payload = {
+        "chunk_id": chunk_id,
+        "section": SECTION_NAME,
+        "scenario": extract_heading(chunk),
+        "text": chunk,
+    }
+    return PointStruct(id=deterministic_uuid(chunk_id), vector=vector, payload=payload)
+
+
+def _print_sanity_check(point: PointStruct) -> None:
+    print("\n=== INGESTION SANITY CHECK ===")
+    print(point.payload["text"][:500])
+    print("==============================")
+
+
+UPSERT_BATCH_SIZE = 128
+# Qdrant recommends 2-4 parallel upload streams; more mostly queues server-side
+UPSERT_WORKERS = 4
+
+
+class _PointWriter:
+    """
+    Upsert point batches with up to `workers` requests in flight.
+
+    Batches go out on threads sharing one client (the upsert is network
+    I/O), not on qdrant-client's `upload_points(parallel=...)` process pool,
+    whose workers each re-import this module and open their own client;
+    with spawn (Windows) that costs more than the upload of a few hundred
+    points. `submit` blocks while `workers` batches are pending, so only
+    that many batches of PointStructs are alive. The first failed batch
+    is re-raised by the next `submit` or by `close`.
+    """
+
+    def __init__(self, client, collection_name: str, workers: int) -> None:
+        self.client = client
+        self.collection_name = collection_name
+        self._slots = threading.BoundedSemaphore(workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending: list[Future] = []
+
+    def submit(self, batch: list[PointStruct]) -> None:
+        self._slots.acquire()
+        self._raise_failed()
+        future = self._pool.submit(
+            self.client.upsert,
+            collection_name=self.collection_name,
+            points=batch,
+            wait=True,
+        )
+        # Callback holds the semaphore only (no cycle back to the client)
+        slots = self._slots
+        future.add_done_callback(lambda _: slots.release())
+        self._pending.append(future)
+
+    def close(self) -> None:
+        try:
+            for future in self._pending:
+                future.result()
+        finally:
+            self._pending = []
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _raise_failed(self) -> None:
+        still_pending = []
+        for future in self._pending:
+            if future.done():
+                future.result()
+            else:
+                still_pending.append(future)
+        self._pending = still_pending
+
+    def __enter__(self) -> "_PointWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _upsert_workers(cfg) -> int:
+    # Local mode writes in-process to one storage; a single writer is enough
+    return UPSERT_WORKERS if cfg.url else 1
+
 
 def _upsert_chunks(
     chunks: list[str],
@@ -163,50 +515,172 @@ def _upsert_chunks(
     embed_model: str,
     prefix: str,
 ) -> None:
-    embedder = FastEmbedder(embed_model)
-    vectors = embedder.embed(chunks)
-    dim = embedder.dim
+    embedder = _make_embedder(embed_model)
+    # One batched call for the whole document; dim comes from the result
+    # rather than a separate probe inference.
+    vectors = _embed_unique(embedder, chunks)
+    dim = vectors.shape[1]
 
     cfg = get_qdrant_config()
     cfg.collection = collection_name
     client = get_client(cfg)
 
-    _create_collection(client, collection_name, dim)
+    # Written under a staging name; the live collection is only replaced
+    # once this one is complete (see _publish_collection).
+    staging = _staging_name(collection_name)
+    _create_collection(client, staging, dim, index_payload=bool(cfg.url))
+
+    _print_sanity_check(_make_point(prefix, 0, chunks[0], vectors[0].tolist()))
+
+    try:
+        # Points are built per batch, right before they are sent. Against a
+        # server, UPSERT_WORKERS batches are in flight at once.
+        with _PointWriter(client, staging, _upsert_workers(cfg)) as writer:
+            for start in range(0, len(chunks), UPSERT_BATCH_SIZE):
+                rows = vectors[start : start + UPSERT_BATCH_SIZE].tolist()
+                writer.submit([
+                    _make_point(prefix, start + i, chunks[start + i], row)
+                    for i, row in enumerate(rows)
+                ])
+        _build_index(client, staging)
+    except BaseException:
+        _drop_collection(client, staging)
+        raise
+
+    _publish_collection(client, collection_name, staging)
+
+    print(f"[SUCCESS] Ingested {len(chunks)} scenario chunks")
+    print(f"[SUCCESS] Embedding model: {embed_model} (dim={dim})")
 
-    points: List[PointStruct] = []
 
-    for idx, (chunk, vector) in enumerate(zip(chunks, vectors)):
-        chunk_id = f"{prefix}-c{idx:04d}"
-        point_id = deterministic_uuid(chunk_id)
-        scenario = extract_heading(chunk)
+# ---------------------------------------------------------
+# Streaming ingestion pipeline
+# ---------------------------------------------------------
+PIPELINE_QUEUE_SIZE = 64
+PIPELINE_EMBED_BATCH = 32
+PIPELINE_UPSERT_BATCH = 256
 
-        payload = {
-            "chunk_id": chunk_id,
-            "section": EMERGENCY_SECTION["name"],
-            "scenario": scenario,
-            "text": chunk,
-        }
+_END = object()
 
-        points.append(
-            PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=payload,
-            )
-        )
 
-    print("\n=== INGESTION SANITY CHECK ===")
-    print(points[0].payload["text"][:500])
-    print("==============================")
+async def _take_batch(queue: asyncio.Queue, size: int) -> tuple[list, bool]:
+    """
+    Wait for at least one item, then take whatever else is ready up to `size`.
+    Returns (items, finished).
+    """
+    items = []
+    item = await queue.get()
+    while item is not _END:
+        items.append(item)
+        if len(items) >= size or queue.empty():
+            return items, False
+        item = queue.get_nowait()
+    return items, True
+
+
+async def _ingest_pipeline(
+    segments: Iterable[str],
+    collection_name: str,
+    embed_model: str,
+    prefix: str,
+) -> tuple[int, int, int]:
+    """
+    Run load -> chunk -> embed -> upsert as concurrent stages joined by
+    bounded queues, so extraction, inference and Qdrant writes overlap.
 
-    client.upsert(
-        collection_name=collection_name,
-        points=points,
-        wait=True,
-    )
+    Returns (segments, chunks, dim).
+    """
+    page_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    chunk_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    point_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_UPSERT_BATCH)
+    counts = {"segments": 0, "chunks": 0, "dim": 0}
 
-    print(f"[SUCCESS] Ingested {len(points)} scenario chunks")
-    print(f"[SUCCESS] Embedding model: {embed_model} (dim={dim})")
+    embedder = _make_embedder(embed_model)
+    embedded: dict[str, np.ndarray] = {}
+    cfg = get_qdrant_config()
+    cfg.collection = collection_name
+    client = get_client(cfg)
+    # Written under a staging name while pages are still being extracted;
+    # the live collection is only replaced once everything succeeded.
+    staging = _staging_name(collection_name)
+
+    async def load_pages() -> None:
+        it = iter(segments)
+        while (text := await asyncio.to_thread(next, it, _END)) is not _END:
+            counts["segments"] += 1
+            await page_q.put(text)
+        await page_q.put(_END)
+
+    async def chunk() -> None:
+        splitter = StructuralBlockSplitter()
+        while (text := await page_q.get()) is not _END:
+            for block in splitter.feed(text):
+                await chunk_q.put((counts["chunks"], block))
+                counts["chunks"] += 1
+        for block in splitter.close():
+            await chunk_q.put((counts["chunks"], block))
+            counts["chunks"] += 1
+        await chunk_q.put(_END)
+
+    async def embed() -> None:
+        finished = False
+        while not finished:
+            batch, finished = await _take_batch(chunk_q, PIPELINE_EMBED_BATCH)
+            if not batch:
+                continue
+            vectors = await asyncio.to_thread(
+                _embed_unique, embedder, [c for _, c in batch], embedded
+            )
+            for (idx, block), vector in zip(batch, vectors.tolist()):
+                await point_q.put(_make_point(prefix, idx, block, vector))
+        await point_q.put(_END)
+
+    async def upsert() -> None:
+        writer = _PointWriter(client, staging, _upsert_workers(cfg))
+        try:
+            finished = False
+            while not finished:
+                batch, finished = await _take_batch(point_q, PIPELINE_UPSERT_BATCH)
+                if not batch:
+                    continue
+                if not counts["dim"]:
+                    # Create the staging collection once there is data to write
+                    counts["dim"] = len(batch[0].vector)
+                    await asyncio.to_thread(
+                        _create_collection,
+                        client,
+                        staging,
+                        counts["dim"],
+                        index_payload=bool(cfg.url),
+                    )
+                    _print_sanity_check(batch[0])
+                # Returns once a write slot is free; the batch uploads on
+                # the writer's threads while the next one is collected.
+                await asyncio.to_thread(writer.submit, batch)
+        finally:
+            await asyncio.to_thread(writer.close)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(load_pages())
+            tg.create_task(chunk())
+            tg.create_task(embed())
+            tg.create_task(upsert())
+
+        if counts["dim"]:
+            _build_index(client, staging)
+    except BaseException as e:
+        # e.g. a page failing OCR: the live collection stays as it was
+        _drop_collection(client, staging)
+        if isinstance(e, BaseExceptionGroup) and len(e.exceptions) == 1:
+            # Report the failing stage's own error, not the TaskGroup wrapper
+            raise e.exceptions[0]
+        raise
+
+    if counts["dim"]:
+        _publish_collection(client, collection_name, staging)
+
+    return counts["segments"], counts["chunks"], counts["dim"]
 
 
 # ---------------------------------------------------------
@@ -225,22 +699,26 @@ def ingest_pdf(
         f"(pages {EMERGENCY_SECTION['start_page']}–{EMERGENCY_SECTION['end_page']})"
     )
 
-    raw_text = extract_part8_text(
-        pdf_path=pdf_path,
-        start_page=EMERGENCY_SECTION["start_page"],
-        end_page=EMERGENCY_SECTION["end_page"],
+    segments, chunks, dim = asyncio.run(
+        _ingest_pipeline(
+            segments=extract_part8_text(
+                pdf_path=pdf_path,
+                start_page=EMERGENCY_SECTION["start_page"],
+                end_page=EMERGENCY_SECTION["end_page"],
+            ),
+            collection_name=collection_name,
+            embed_model=embed_model,
+            prefix="emergency-pdf",
+        )
     )
 
-    chunks = split_structural_blocks(raw_text)
+    if not segments:
+        raise RuntimeError("No usable text extracted from PDF")
     if not chunks:
         raise RuntimeError("No scenario blocks produced from PDF")
 
-    _upsert_chunks(
-        chunks=chunks,
-        collection_name=collection_name,
-        embed_model=embed_model,
-        prefix="emergency-pdf",
-    )
+    print(f"[SUCCESS] Ingested {chunks} scenario chunks")
+    print(f"[SUCCESS] Embedding model: {embed_model} (dim={dim})")
 
 
 def ingest_txt_file(
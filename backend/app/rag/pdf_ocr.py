@@ -1,25 +1,16 @@
-from pdf2image import convert_from_path
+from PIL import Image
 import pytesseract
 
+OCR_DPI = 300
 
-def extract_pages_ocr(
-    pdf_path: str,
-    start_page: int,
-    end_page: int,
-) -> str:
-    """
-    OCR extract text from PDF pages (1-based, inclusive).
-    """
-    images = convert_from_path(
-        pdf_path,
-        first_page=start_page,
-        last_page=end_page,
-        dpi=300,
-    )
 
-    text = ""
-    for img in images:
-        page_text = pytesseract.image_to_string(img, lang="eng")
-        text += page_text + "\n"
+def ocr_page(page, dpi: int = OCR_DPI) -> str:
+    """
+    OCR a single already-open fitz page.
 
-    return text
+    Rasterizes in-process with PyMuPDF, so the PDF is not re-opened and
+    re-parsed per page.
+    """
+    pix = page.get_pixmap(dpi=dpi, alpha=False)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    return pytesseract.image_to_string(img, lang="eng") + "\n"
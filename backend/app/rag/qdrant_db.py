@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import hashlib
+import uuid
 from dataclasses import dataclass
 from typing import Optional
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 
 from app.config import settings
 
@@ -14,6 +16,10 @@ class QdrantConfig:
     path: Optional[str] = None
     url: Optional[str] = None
     api_key: Optional[str] = None
+    prefer_grpc: bool = True
+    grpc_port: int = 6334
+    pool_size: int = 100
+    timeout: int = 30
 
 
 def get_qdrant_config() -> QdrantConfig:
@@ -22,13 +28,53 @@ def get_qdrant_config() -> QdrantConfig:
         path=settings.qdrant_path,
         url=settings.qdrant_url,
         api_key=settings.qdrant_api_key,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+        pool_size=settings.qdrant_pool_size,
+        timeout=settings.qdrant_timeout,
     )
 
 
-def get_client(cfg: QdrantConfig) -> QdrantClient:
+def _client_kwargs(cfg: QdrantConfig) -> dict:
     # Prefer URL when provided; else local mode via path.
+    # Against a server, data-plane calls go over gRPC (protobuf float32
+    # vectors instead of JSON) on a pool of `pool_size` connections, so
+    # bursts of concurrent requests do not queue behind a few channels.
+    # Local and in-memory modes have no transport.
     if cfg.url:
-        return QdrantClient(url=cfg.url, api_key=cfg.api_key)
+        return {
+            "url": cfg.url,
+            "api_key": cfg.api_key,
+            "prefer_grpc": cfg.prefer_grpc,
+            "grpc_port": cfg.grpc_port,
+            "pool_size": cfg.pool_size,
+            "timeout": cfg.timeout,
+        }
     if not cfg.path:
-        return QdrantClient(":memory:")
-    return QdrantClient(path=cfg.path)
+        return {"location": ":memory:"}
+    return {"path": cfg.path}
+
+
+def get_client(cfg: QdrantConfig) -> QdrantClient:
+    return QdrantClient(**_client_kwargs(cfg))
+
+
+def get_async_client(cfg: QdrantConfig) -> AsyncQdrantClient:
+    """
+    Client for the API: calls are awaited on the event loop instead of
+    occupying a worker thread for every Qdrant round-trip.
+    """
+    return AsyncQdrantClient(**_client_kwargs(cfg))
+
+
+_UUID5_URL_PREFIX = hashlib.sha1(uuid.NAMESPACE_URL.bytes)
+
+
+def deterministic_uuid(text_id: str) -> str:
+    """
+    Point id for a chunk id; same value as `uuid.uuid5(uuid.NAMESPACE_URL, text_id)`,
+    with the namespace already absorbed into the SHA-1 state.
+    """
+    h = _UUID5_URL_PREFIX.copy()
+    h.update(text_id.encode("utf-8"))
+    return str(uuid.UUID(bytes=h.digest()[:16], version=5))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from app.config import settings
+from app.rag.embeddings import QUANTIZED_MODEL_FILE
+
+# Tokenizer/config files FastEmbed expects next to the ONNX graph
+MODEL_SIDE_FILES = (
+    "config.json",
+    "tokenizer.json",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "vocab.txt",
+)
+
+
+def _source_model_dir(model_name: str) -> Path:
+    """Download (or reuse the cached) FastEmbed model and return its directory."""
+    from fastembed import TextEmbedding
+
+    model = TextEmbedding(model_name=model_name)
+    return Path(model.model._model_dir)
+
+
+def quantize_model(source_dir: Path, out_dir: Path, model_file: str | None = None) -> Path:
+    """
+    Write an INT8 (dynamic, weight-only) copy of an ONNX embedding model.
+
+    The graph is first pre-processed (shape inference + ORT graph fusion) so
+    the quantizer sees fused MatMul/Attention nodes and emits integer kernels
+    for them. Tokenizer and config files are copied alongside so `out_dir`
+    can be used directly as `EMBED_MODEL_PATH`.
+    """
+    # onnx is only needed for this offline step, not at serve time
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if model_file is None:
+        candidates = sorted(source_dir.rglob("*.onnx"))
+        if not candidates:
+            raise FileNotFoundError(f"No .onnx model found under {source_dir}")
+        in_model = candidates[0]
+    else:
+        in_model = source_dir / model_file
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_model = out_dir / QUANTIZED_MODEL_FILE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = Path(tmp) / "prepared.onnx"
+        quant_pre_process(str(in_model), str(prepared))
+        quantize_dynamic(str(prepared), str(out_model), weight_type=QuantType.QInt8)
+
+    for name in MODEL_SIDE_FILES:
+        src = source_dir / name
+        if src.exists():
+            shutil.copy2(src, out_dir / name)
+
+    return out_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embed-model", default=settings.embed_model)
+    parser.add_argument("--source-dir", default=None, help="Local ONNX export (defaults to the FastEmbed download)")
+    parser.add_argument("--model-file", default=None)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    source_dir = Path(args.source_dir) if args.source_dir else _source_model_dir(args.embed_model)
+    out_model = quantize_model(source_dir, Path(args.out), model_file=args.model_file)
+    print(f"Wrote {out_model}")
+
+
+if __name__ == "__main__":
+    main()
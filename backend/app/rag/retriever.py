@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Set
-
-from qdrant_client.models import Filter, FieldCondition, MatchAny
+from functools import cached_property, lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Set
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    PayloadSelectorInclude,
+    QuantizationSearchParams,
+    QueryRequest,
+    Record,
+    SearchParams,
+)
 
 from app.config import settings
 from app.rag.embeddings import FastEmbedder
-from app.rag.qdrant_db import get_client, get_qdrant_config
+from app.rag.qdrant_db import QdrantConfig, deterministic_uuid, get_async_client, get_qdrant_config
+
+
+# Every battery/jump-start keyword ("dead battery", "jump start", ...)
+# contains one of these two, so one case-insensitive search covers them all.
+BATTERY_RE = re.compile(r"battery|jump", re.IGNORECASE)
 
 
 # ---------------------------------------------------------
@@ -20,6 +36,110 @@ class RetrievedChunk:
     metadata: Dict[str, Any]
     score: float
 
+    @cached_property
+    def text_lower(self) -> str:
+        # Built once per chunk; answer assembly matches against it repeatedly.
+        return self.text.lower()
+
+
+# ---------------------------------------------------------
+# Process-wide resources
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def _shared_client(
+    url: str | None,
+    api_key: str | None,
+    path: str | None,
+    prefer_grpc: bool,
+    grpc_port: int,
+    pool_size: int,
+    timeout: int,
+) -> AsyncQdrantClient:
+    """
+    One client per connection config, shared by every Retriever. Its
+    connection pool is meant to be shared, and a local-mode path can only
+    be opened once per process.
+    """
+    cfg = QdrantConfig(
+        collection=settings.qdrant_collection,
+        path=path,
+        url=url,
+        api_key=api_key,
+        prefer_grpc=prefer_grpc,
+        grpc_port=grpc_port,
+        pool_size=pool_size,
+        timeout=timeout,
+    )
+    return get_async_client(cfg)
+
+
+@lru_cache(maxsize=None)
+def _shared_embedder(
+    model_name: str,
+    batch_window_ms: float,
+    max_batch: int,
+    threads: int | None,
+    model_path: str | None,
+    cache_size: int,
+) -> FastEmbedder:
+    """
+    One loaded model (and query-embedding cache) per embedder config.
+    """
+    return FastEmbedder(
+        model_name,
+        batch_window_ms=batch_window_ms,
+        max_batch=max_batch,
+        threads=threads,
+        model_path=model_path,
+        cache_size=cache_size,
+    )
+
+
+# ---------------------------------------------------------
+# Similarity normalization
+# ---------------------------------------------------------
+def _score(hit) -> float:
+    return float(hit.score)
+
+
+def _distance(hit) -> float:
+    return 1.0 - float(hit.distance)
+
+
+def _unscored(hit) -> float:
+    # e.g. a Record fetched as a context neighbour
+    return 1.0
+
+
+def _probe(hit) -> float:
+    score = getattr(hit, "score", None)
+    if score is not None:
+        return float(score)
+
+    distance = getattr(hit, "distance", None)
+    if distance is not None:
+        return 1.0 - float(distance)
+
+    return 1.0
+
+
+@lru_cache(maxsize=None)
+def _similarity_getter(hit_type: type) -> Callable[[Any], float]:
+    """
+    Resolve once per point type how its similarity is read. Qdrant models
+    declare their fields, so ScoredPoint (score) and Record (no score) skip
+    per-hit attribute probing; a missing attribute on a pydantic model is
+    an exception internally and costs microseconds.
+    """
+    fields = getattr(hit_type, "model_fields", None)
+    if fields is None:
+        return _probe
+    if "score" in fields:
+        return _score
+    if "distance" in fields:
+        return _distance
+    return _unscored
+
 
 # ---------------------------------------------------------
 # Retriever
@@ -28,6 +148,9 @@ class Retriever:
     """
     Generic, source-agnostic retriever for procedural manuals.
 
+    All lookups are coroutines on an AsyncQdrantClient; query embedding runs
+    in a worker thread (see FastEmbedder.embed_one_async).
+
     Strategy:
     1. Broad semantic retrieval (high recall)
     2. Score thresholding (noise reduction)
@@ -40,58 +163,175 @@ class Retriever:
     SCORE_THRESHOLD = 0.55
     CONTEXT_WINDOW = 1
 
+    # Server collections keep INT8-quantized vectors in RAM; oversample
+    # candidates from them, then rescore with the original float32 vectors.
+    SEARCH_PARAMS = SearchParams(
+        quantization=QuantizationSearchParams(rescore=True, oversampling=2.0),
+    )
+
+    # Only the payload fields RetrievedChunk is built from travel back
+    PAYLOAD_FIELDS = PayloadSelectorInclude(
+        include=["chunk_id", "scenario", "text", "page", "section"],
+    )
+
     def __init__(self) -> None:
         self.cfg = get_qdrant_config()
-        self.client = get_client(self.cfg)
-        self.embedder = FastEmbedder(settings.embed_model)
+        self.client = _shared_client(
+            self.cfg.url,
+            self.cfg.api_key,
+            self.cfg.path,
+            self.cfg.prefer_grpc,
+            self.cfg.grpc_port,
+            self.cfg.pool_size,
+            self.cfg.timeout,
+        )
+        # Local mode is exact brute-force search and warns on search_params
+        self.search_params = self.SEARCH_PARAMS if self.cfg.url else None
+        self.embedder = _shared_embedder(
+            settings.embed_model,
+            settings.embed_batch_window_ms,
+            settings.embed_max_batch,
+            settings.embed_threads,
+            settings.embed_model_path,
+            settings.embed_cache_size,
+        )
 
     # ---------------------------------------------------------
     # Public API
     # ---------------------------------------------------------
-    def retrieve(
+    async def retrieve(
         self,
         query: str,
         top_k: int | None = None,
         intent: str | None = None,
+        query_vector: np.ndarray | None = None,
     ) -> List[RetrievedChunk]:
         """
         Retrieve context-aware chunks relevant to the query.
+
+        `query_vector` may be passed when the caller already embedded the
+        query, to avoid embedding it twice.
         """
+        points = await self._search(query, top_k, query_vector)
+        return await self._rank(query.lower(), points, intent)
 
-        query_l = query.lower()
+    async def retrieve_stream(
+        self,
+        query: str,
+        top_k: int | None = None,
+        intent: str | None = None,
+        query_vector: np.ndarray | None = None,
+    ) -> AsyncIterator[tuple[str, List[RetrievedChunk]]]:
+        """
+        `retrieve` in two phases: yields ("initial", matched chunks) once the
+        broad query is ranked, then ("final", chunks) after context expansion.
+        """
+        points = await self._search(query, top_k, query_vector)
+        hits = self._select(query.lower(), points, intent)
+        yield "initial", self._to_retrieved_chunks(hits)
+        yield "final", (await self._expand(hits, points, intent) if hits else [])
+
+    async def _search(self, query: str, top_k: int | None, query_vector: np.ndarray | None):
+        """
+        Steps 1-2 of the strategy; an unavailable collection yields no points.
+        """
 
         # --------------------------------------------------
         # 1. Embed query
         # --------------------------------------------------
-        query_vector = self.embedder.embed_one(query)
+        if query_vector is None:
+            query_vector = await self.embedder.embed_one_async(query)
 
         # --------------------------------------------------
         # 2. Broad semantic retrieval (pytest-safe)
         # --------------------------------------------------
         try:
-            response = self.client.query_points(
+            response = await self.client.query_points(
                 collection_name=self.cfg.collection,
                 query=query_vector,
                 limit=(top_k or self.BASE_TOP_K) * 2,
-                with_payload=True,
+                with_payload=self.PAYLOAD_FIELDS,
+                with_vectors=False,
+                search_params=self.search_params,
             )
         except Exception:
             # Qdrant not initialized / ingestion not run
             # Treat as empty knowledge base (pytest-safe)
             return []
 
+        return response.points
+
+    async def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int | None = None,
+        intent: str | None = None,
+        query_vectors: np.ndarray | None = None,
+    ) -> List[List[RetrievedChunk]]:
+        """
+        Batched `retrieve`: one embedding call and one Qdrant round-trip
+        (query_batch_points) for all queries. Results are in query order.
+        """
+        if not queries:
+            return []
+
+        if query_vectors is None:
+            query_vectors = await asyncio.to_thread(self.embedder.embed, queries)
+
+        limit = (top_k or self.BASE_TOP_K) * 2
+        requests = [
+            QueryRequest(
+                query=v.tolist(),
+                limit=limit,
+                with_payload=self.PAYLOAD_FIELDS,
+                with_vector=False,
+                params=self.search_params,
+            )
+            for v in query_vectors
+        ]
+
+        try:
+            responses = await self.client.query_batch_points(
+                collection_name=self.cfg.collection,
+                requests=requests,
+            )
+        except Exception:
+            # Qdrant not initialized / ingestion not run (pytest-safe)
+            return [[] for _ in queries]
+
+        # Neighbour lookups for the individual queries run concurrently
+        return list(
+            await asyncio.gather(
+                *(
+                    self._rank(query.lower(), response.points, intent)
+                    for query, response in zip(queries, responses)
+                )
+            )
+        )
+
+    async def _rank(self, query_l: str, points, intent: str | None) -> List[RetrievedChunk]:
+        """
+        Steps 3-7 of the strategy, applied to the points of one broad query.
+        """
+        hits = self._select(query_l, points, intent)
+        if not hits:
+            return []
+        return await self._expand(hits, points, intent)
+
+    def _select(self, query_l: str, points, intent: str | None) -> list:
+        """
+        Steps 3-4: the hits whose context is returned.
+        """
+
         # --------------------------------------------------
         # 3. Score thresholding
         # --------------------------------------------------
         initial_hits = []
 
-        for hit in response.points:
-            score = self._get_similarity(hit)
-            scenario = (hit.payload.get("scenario") or "").lower()
-
-            if score >= self.SCORE_THRESHOLD:
+        for hit in points:
+            if self._get_similarity(hit) >= self.SCORE_THRESHOLD:
                 initial_hits.append(hit)
-            elif intent == "pre_drive" and "pre-drive" in scenario:
+            elif intent == "pre_drive" and "pre-drive" in (hit.payload.get("scenario") or "").lower():
                 initial_hits.append(hit)
 
         if not initial_hits:
@@ -101,24 +341,41 @@ class Retriever:
         # 4. Scenario-aware biasing (battery / jump-start)
         # --------------------------------------------------
         def is_battery_related(hit) -> bool:
-            scenario = (hit.payload.get("scenario") or "").lower()
-            text = (hit.payload.get("text") or "").lower()
-            return any(
-                kw in scenario or kw in text
-                for kw in ("battery", "jump", "jump start", "jump-start")
+            return bool(
+                BATTERY_RE.search(hit.payload.get("scenario") or "")
+                or BATTERY_RE.search(hit.payload.get("text") or "")
             )
 
-        if any(kw in query_l for kw in ("battery", "dead battery", "jump")):
+        if BATTERY_RE.search(query_l):
             battery_hits = [h for h in initial_hits if is_battery_related(h)]
             if battery_hits:
                 initial_hits = battery_hits
 
+        return initial_hits
+
+    async def _expand(self, initial_hits: list, points, intent: str | None) -> List[RetrievedChunk]:
+        """
+        Steps 5-7: neighbours of the selected hits, in procedural order.
+        """
+
         # --------------------------------------------------
         # 5. Expand context
         # --------------------------------------------------
         chunk_ids_to_fetch = self._expand_context(initial_hits)
 
-        expanded_hits = self._fetch_by_chunk_ids(chunk_ids_to_fetch)
+        # The broad query usually returned most neighbours already; reuse
+        # those payloads and only go back to Qdrant for the rest.
+        returned = {
+            (p.payload or {}).get("chunk_id"): p for p in points
+        }
+        expanded_hits = [
+            Record(id=returned[cid].id, payload=returned[cid].payload)
+            for cid in chunk_ids_to_fetch
+            if cid in returned
+        ]
+        expanded_hits.extend(
+            await self._fetch_by_chunk_ids(chunk_ids_to_fetch - returned.keys())
+        )
 
         # --------------------------------------------------
         # 6. Convert to RetrievedChunk objects
@@ -140,23 +397,32 @@ class Retriever:
 
         return results
 
+    async def get_chunk(self, chunk_id: str) -> RetrievedChunk | None:
+        """
+        Look up a single chunk by its chunk_id payload.
+        """
+        try:
+            hits = await self._fetch_by_chunk_ids({chunk_id})
+        except Exception:
+            # Qdrant not initialized / ingestion not run (pytest-safe)
+            return None
+
+        results = self._to_retrieved_chunks(hits)
+        return results[0] if results else None
+
     # ---------------------------------------------------------
     # Similarity normalization
     # ---------------------------------------------------------
     def _get_similarity(self, hit) -> float:
-        if hasattr(hit, "score") and hit.score is not None:
-            return float(hit.score)
-
-        if hasattr(hit, "distance") and hit.distance is not None:
-            return 1.0 - float(hit.distance)
-
-        return 1.0
+        return _similarity_getter(type(hit))(hit)
 
     # ---------------------------------------------------------
     # Context expansion logic
     # ---------------------------------------------------------
     def _expand_context(self, hits) -> Set[str]:
-        chunk_ids: Set[str] = set()
+        # Neighbour indices are collected per prefix first, so windows of
+        # adjacent hits (the usual case for a procedure) are formatted once.
+        by_prefix: Dict[str, Set[int]] = {}
 
         for hit in hits:
             payload = hit.payload or {}
@@ -171,50 +437,33 @@ class Retriever:
             except ValueError:
                 continue
 
-            for offset in range(-self.CONTEXT_WINDOW, self.CONTEXT_WINDOW + 1):
-                neighbor_idx = base_idx + offset
-                if neighbor_idx < 0:
-                    continue
-                chunk_ids.add(f"{prefix}-c{neighbor_idx:04d}")
+            by_prefix.setdefault(prefix, set()).update(
+                range(max(base_idx - self.CONTEXT_WINDOW, 0), base_idx + self.CONTEXT_WINDOW + 1)
+            )
 
-        return chunk_ids
+        return {
+            f"{prefix}-c{idx:04d}"
+            for prefix, indices in by_prefix.items()
+            for idx in indices
+        }
 
     # ---------------------------------------------------------
     # Qdrant helpers
     # ---------------------------------------------------------
-    def _fetch_by_chunk_ids(self, chunk_ids: Set[str]):
+    async def _fetch_by_chunk_ids(self, chunk_ids: Set[str]):
         if not chunk_ids:
             return []
 
-        flt = Filter(
-            must=[
-                FieldCondition(
-                    key="chunk_id",
-                    match=MatchAny(any=list(chunk_ids)),
-                )
-            ]
+        # Point ids are derived from chunk ids at ingest time, so this is a
+        # direct id lookup rather than a filtered payload scan. Ids that do
+        # not exist (e.g. neighbours past the last chunk) are simply absent.
+        return await self.client.retrieve(
+            collection_name=self.cfg.collection,
+            ids=[deterministic_uuid(cid) for cid in chunk_ids],
+            with_payload=self.PAYLOAD_FIELDS,
+            with_vectors=False,
         )
 
-        points = []
-        offset = None
-
-        while True:
-            batch, offset = self.client.scroll(
-                collection_name=self.cfg.collection,
-                scroll_filter=flt,
-                limit=64,
-                offset=offset,
-                with_payload=True,
-                with_vectors=False,
-            )
-
-            points.extend(batch)
-
-            if offset is None:
-                break
-
-        return points
-
     # ---------------------------------------------------------
     # Conversion helpers
     # ---------------------------------------------------------
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+# ---------------------------------------------------------
+# Exact-match cache
+# ---------------------------------------------------------
+class LRUCache:
+    """
+    Thread-safe bounded mapping with least-recently-used eviction.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> List[tuple[Hashable, Any]]:
+        """Snapshot of the entries, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# ---------------------------------------------------------
+# Partition (one namespace)
+# ---------------------------------------------------------
+class _Partition:
+    """
+    Fixed-capacity store of L2-normalized query vectors and their values.
+
+    Rows are kept in a contiguous matrix so a lookup is a single
+    matrix-vector product. Storage grows by doubling up to `max_entries`,
+    after which the least recently used row is overwritten.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, dim: int, max_entries: int) -> None:
+        self.max_entries = max_entries
+        capacity = min(self.INITIAL_CAPACITY, max_entries)
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.values: List[Any] = []
+
+    def best(self, vector: np.ndarray) -> tuple[int, float]:
+        n = len(self.values)
+        sims = self.vectors[:n] @ vector
+        idx = int(sims.argmax())
+        return idx, float(sims[idx])
+
+    def add(self, vector: np.ndarray, value: Any, tick: int) -> None:
+        n = len(self.values)
+
+        if n < self.max_entries:
+            if n == len(self.vectors):
+                self._grow()
+            self.vectors[n] = vector
+            self.last_used[n] = tick
+            self.values.append(value)
+            return
+
+        idx = int(self.last_used.argmin())
+        self.vectors[idx] = vector
+        self.last_used[idx] = tick
+        self.values[idx] = value
+
+    def _grow(self) -> None:
+        capacity = min(len(self.vectors) * 2, self.max_entries)
+        vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+        last_used = np.zeros(capacity, dtype=np.int64)
+        vectors[: len(self.vectors)] = self.vectors
+        last_used[: len(self.last_used)] = self.last_used
+        self.vectors = vectors
+        self.last_used = last_used
+
+
+# ---------------------------------------------------------
+# Semantic cache
+# ---------------------------------------------------------
+class SemanticCache:
+    """
+    Similarity cache keyed by query embeddings.
+
+    A lookup returns the value stored for the most similar previous query
+    when the cosine similarity reaches `threshold`. Entries are partitioned
+    by namespace (e.g. intent and top_k) so that answers never leak across
+    namespaces; each namespace holds at most `max_entries` (LRU eviction).
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 4096) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._partitions: Dict[Hashable, _Partition] = {}
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(p.values) for p in self._partitions.values())
+
+    def get(self, namespace: Hashable, vector: Sequence[float]) -> Optional[Any]:
+        q = _normalize(vector)
+
+        with self._lock:
+            partition = self._partitions.get(namespace)
+            if partition is None or not partition.values:
+                return None
+
+            idx, sim = partition.best(q)
+            if sim < self.threshold:
+                return None
+
+            self._tick += 1
+            partition.last_used[idx] = self._tick
+            return partition.values[idx]
+
+    def put(self, namespace: Hashable, vector: Sequence[float], value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+
+        q = _normalize(vector)
+
+        with self._lock:
+            partition = self._partitions.get(namespace)
+            if partition is None:
+                partition = _Partition(dim=len(q), max_entries=self.max_entries)
+                self._partitions[namespace] = partition
+
+            self._tick += 1
+            partition.add(q, value, self._tick)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    return v / (np.linalg.norm(v) + 1e-12)
@@ -0,0 +1,28 @@
+from app.rag.answer import _extract_numbered_steps, _extract_tools, _extract_warning_lines, classify_intent
+from app.rag.retriever import RetrievedChunk
+
+
+def test_extract_tools_reports_nested_keywords_in_list_order():
+    chunks = [
+        RetrievedChunk(id="1", text="Loosen the nuts with the wheel spanner.", metadata={}, score=0.9),
+        RetrievedChunk(id="2", text="Connect the JUMPER CABLES, then use the jack.", metadata={}, score=0.8),
+    ]
+
+    assert _extract_tools(chunks) == ["jack", "wheel spanner", "spanner", "jumper cable", "jumper cables"]
+
+
+def test_classify_intent():
+    assert classify_intent("How do I puncture someone's TYRE?") == "malicious"
+    assert classify_intent("Flat tyre while driving") == "assistance"
+
+
+def test_extract_warning_lines_dedupes_in_order():
+    text = "  Warning: hot engine\nCAUTION keep clear\nwarning: hot engine\nno warning here\n  Warning: hot engine"
+
+    assert _extract_warning_lines(text) == ["Warning: hot engine", "CAUTION keep clear", "warning: hot engine"]
+
+
+def test_extract_numbered_steps():
+    text = "If the Engine Overheats\n 1. Stop the vehicle.\n\n2.  Switch off the A/C.\n3.No space\n10. Call assistance."
+
+    assert _extract_numbered_steps(text) == ["Stop the vehicle.", "Switch off the A/C.", "Call assistance."]
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from app.main import _normalize_query, app
+
+client = TestClient(app)
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert _normalize_query("  Flat   TYRE\n") == "flat tyre"
+
+def test_cache_clear():
+    r = client.post("/cache/clear")
+    assert r.status_code == 200
+    assert r.json()["status"] == "ok"
+
+def test_query_embedding_is_memoized():
+    from app.main import retriever
+
+    first = retriever.embedder.embed_one("jump start battery")
+    second = retriever.embedder.embed_one("jump start battery")
+    assert first is second
+    assert not first.flags.writeable
+
+def test_query_embedding_cache_ignores_whitespace_runs():
+    from app.main import retriever
+
+    first = retriever.embedder.embed_one("flat  tyre\n")
+    second = retriever.embedder.embed_one("flat tyre")
+    assert first is second
+
+def test_query_embedding_cache_survives_restart(tmp_path):
+    from app.main import retriever
+    from app.rag.embeddings import FastEmbedder
+
+    vector = retriever.embedder.embed_one("engine overheating")
+    path = str(tmp_path / "query_embeddings.npz")
+    assert retriever.embedder.save_query_cache(path) > 0
+
+    fresh = FastEmbedder(retriever.embedder.model_name, model_path=retriever.embedder.model_path)
+    assert fresh.load_query_cache(path) > 0
+    assert (fresh.embed_one("engine overheating") == vector).all()
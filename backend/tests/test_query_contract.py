@@ -13,3 +13,37 @@ def test_query_requires_ingest_or_returns_404():
         assert isinstance(data.get("warnings"), list)
         assert isinstance(data.get("tools"), list)
         assert isinstance(data.get("sources"), list)
+
+def test_sources_omit_text_by_default():
+    r = client.post("/query", json={"query": "dead battery"})
+    assert r.status_code in (200, 404)
+
+    if r.status_code == 200:
+        for source in r.json()["sources"]:
+            assert "text" not in source
+
+def test_unknown_chunk_returns_404():
+    r = client.get("/chunk/no-such-chunk")
+    assert r.status_code == 404
+
+def test_query_batch_returns_one_result_per_query():
+    r = client.post("/query_batch", json={"queries": ["dead battery", "flat tyre"]})
+    assert r.status_code == 200
+
+    results = r.json()["results"]
+    assert len(results) == 2
+    for result in results:
+        if result is not None:
+            assert isinstance(result.get("steps"), list)
+            assert isinstance(result.get("sources"), list)
+
+def test_query_stream_ends_with_final_or_error_frame():
+    import json
+
+    r = client.post("/query/stream", json={"query": "dead battery"})
+    assert r.status_code == 200
+
+    frames = [json.loads(line) for line in r.text.splitlines()]
+    assert frames
+    assert all(f["phase"] == "initial" for f in frames[:-1])
+    assert frames[-1]["phase"] in ("final", "error")
@@ -0,0 +1,28 @@
+from app.rag.semcache import SemanticCache
+
+
+def test_hit_above_threshold_only():
+    cache = SemanticCache(threshold=0.9)
+    cache.put("assistance", [1.0, 0.0], "flat tyre")
+
+    assert cache.get("assistance", [0.99, 0.05]) == "flat tyre"
+    assert cache.get("assistance", [0.0, 1.0]) is None
+
+
+def test_namespaces_are_isolated():
+    cache = SemanticCache(threshold=0.9)
+    cache.put("malicious", [1.0, 0.0], "redirect")
+
+    assert cache.get("assistance", [1.0, 0.0]) is None
+
+
+def test_lru_eviction():
+    cache = SemanticCache(threshold=0.99, max_entries=2)
+    cache.put("ns", [1.0, 0.0, 0.0], "a")
+    cache.put("ns", [0.0, 1.0, 0.0], "b")
+    cache.get("ns", [1.0, 0.0, 0.0])  # touch "a"
+    cache.put("ns", [0.0, 0.0, 1.0], "c")
+
+    assert len(cache) == 2
+    assert cache.get("ns", [1.0, 0.0, 0.0]) == "a"
+    assert cache.get("ns", [0.0, 1.0, 0.0]) is None
@@ -1,6 +1,6 @@
 import React, { useMemo, useState } from 'react'
 
-type SourceChunk = { id: string; page: number; chunk_id?: string; text: string; score: number }
+type SourceChunk = { id: string; page: number; chunk_id?: string; text?: string; score: number }
 type QueryResponse = {
   query: string
   steps: string[]
@@ -12,6 +12,38 @@ type QueryResponse = {
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
+// Responses omit excerpt text; it is fetched the first time a source is opened.
+function SourceDetails({ source }: { source: SourceChunk }) {
+  const [text, setText] = useState<string | null>(source.text ?? null)
+  const [error, setError] = useState<string | null>(null)
+
+  async function onToggle(e: React.SyntheticEvent<HTMLDetailsElement>) {
+    if (!e.currentTarget.open || text !== null || !source.chunk_id) return
+
+    try {
+      const resp = await fetch(`${API_URL}/chunk/${encodeURIComponent(source.chunk_id)}`)
+      if (!resp.ok) throw new Error(`Request failed: ${resp.status}`)
+      const data = (await resp.json()) as { text: string }
+      setText(data.text)
+    } catch (err: any) {
+      setError(err?.message || String(err))
+    }
+  }
+
+  return (
+    <details onToggle={onToggle} style={{ marginBottom: 10, border: '1px solid #eee', padding: 10 }}>
+      <summary>
+        Page {source.page} • {source.chunk_id || source.id} • score {source.score.toFixed(4)}
+      </summary>
+      {error ? (
+        <p style={{ opacity: 0.8 }}>Could not load excerpt: {error}</p>
+      ) : (
+        <pre style={{ whiteSpace: 'pre-wrap' }}>{text ?? 'Loading…'}</pre>
+      )}
+    </details>
+  )
+}
+
 export default function Home() {
   const [query, setQuery] = useState('Type Here for assistance!!')
   const [loading, setLoading] = useState(false)
@@ -162,12 +194,7 @@ export default function Home() {
             <h2>Sources</h2>
             <p style={{ opacity: 0.8 }}>Top retrieved manual excerpts (with page numbers).</p>
             {result.sources.map((c) => (
-              <details key={c.id} style={{ marginBottom: 10, border: '1px solid #eee', padding: 10 }}>
-                <summary>
-                  Page {c.page} • {c.chunk_id || c.id} • score {c.score.toFixed(4)}
-                </summary>
-                <pre style={{ whiteSpace: 'pre-wrap' }}>{c.text}</pre>
-              </details>
+              <SourceDetails key={c.id} source={c} />
             ))}
           </section>
         </div>